@@ -6,6 +6,7 @@ from plotly.subplots import make_subplots
 import plotly.express as px
 from datetime import datetime, timedelta
 import time
+from annuity_table import residual_balance
 
 # Set page config
 st.set_page_config(
@@ -59,15 +60,18 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Novated Lease Calculator Functions
-def calculate_novated_lease(car_value, interest_rate, lease_term, tax_rate, gst_included=False,
-                             annual_fuel=0, annual_maintenance=0, annual_tyres=0,
-                             annual_finance_costs=0, annual_registration_insurance=0):
+def calculate_lease_payment(car_value, interest_rate, lease_term, gst_included=False):
     if gst_included:
         car_value_ex_gst = car_value / 1.1
     else:
         car_value_ex_gst = car_value
 
-    monthly_payment = (car_value_ex_gst * (interest_rate / 12)) / (1 - (1 + interest_rate / 12) ** (-lease_term))
+    return (car_value_ex_gst * (interest_rate / 12)) / (1 - (1 + interest_rate / 12) ** (-lease_term))
+
+def calculate_novated_lease(car_value, interest_rate, lease_term, tax_rate, gst_included=False,
+                             annual_fuel=0, annual_maintenance=0, annual_tyres=0,
+                             annual_finance_costs=0, annual_registration_insurance=0):
+    monthly_payment = calculate_lease_payment(car_value, interest_rate, lease_term, gst_included)
     
     total_annual_costs = (annual_fuel + annual_maintenance + annual_tyres +
                           annual_finance_costs + annual_registration_insurance)
@@ -117,19 +121,138 @@ def breakdown_payments(loan_amount, annual_interest_rate, loan_term_years):
     monthly_interest_rate = annual_interest_rate / 12 / 100
     number_of_payments = loan_term_years * 12
     
-    principal_paid = []
-    interest_paid = []
-    
-    for month in range(1, number_of_payments + 1):
-        interest_for_month = loan_amount * monthly_interest_rate
-        total_repayment = calculate_repayment(loan_amount, annual_interest_rate, loan_term_years)
-        principal_for_month = total_repayment - interest_for_month
-        principal_paid.append(principal_for_month)
-        interest_paid.append(interest_for_month)
-        loan_amount -= principal_for_month
+    # Balance after every payment at once; each month's interest accrues on the
+    # balance before it and the rest of the repayment goes to principal.
+    balances = loan_amount * residual_balance(annual_interest_rate / 100, number_of_payments,
+                                              np.arange(number_of_payments + 1))
+    interest_paid = balances[:-1] * monthly_interest_rate
+    principal_paid = -np.diff(balances)
     
     return principal_paid, interest_paid
 
+# Derived mortgage metrics as a dependency graph: node -> (dependencies, function).
+# Nodes are listed in dependency order; any name that is not a node is an input.
+MORTGAGE_GRAPH = {
+    "loan_amount": (("house_price", "deposit"), lambda house_price, deposit: house_price - deposit),
+    "annual_interest_rate": (("current_long_term_rate", "current_short_term_rate"),
+                             lambda long_term, short_term: calculate_expected_rate(long_term / 100, short_term / 100)),
+    "monthly_repayment": (("loan_amount", "annual_interest_rate", "loan_term_years"),
+                          calculate_repayment),
+    "payment_schedule": (("loan_amount", "annual_interest_rate", "loan_term_years"),
+                         breakdown_payments),
+    "yearly_payments": (("payment_schedule",),
+                        lambda schedule: tuple(aggregate_periods(paid, 12) for paid in schedule)),
+    "total_payment": (("monthly_repayment", "loan_term_years"), lambda repayment, years: repayment * years * 12),
+    "total_interest": (("total_payment", "loan_amount"), lambda total_payment, loan_amount: total_payment - loan_amount),
+    "cgt_due": (("house_price", "selling_price", "years_owned", "capital_losses"), calculate_cgt),
+    "net_profit_from_sale": (("selling_price", "house_price", "cgt_due"),
+                             lambda selling_price, house_price, cgt_due: selling_price - house_price - cgt_due),
+    "net_rental_income": (("rental_income", "property_management_fee_percentage"),
+                          lambda rental_income, fee: rental_income - rental_income * fee),
+    "total_monthly_expenses": (("rent_expense", "utilities_expense", "groceries_expense", "other_expenses",
+                                "monthly_repayment", "net_rental_income"),
+                               lambda rent, utilities, groceries, other, repayment, net_rental_income:
+                                   rent + utilities + groceries + other + repayment - net_rental_income),
+    "net_monthly_savings": (("monthly_income", "total_monthly_expenses"), lambda income, expenses: income - expenses),
+    "new_loan_months": (("loan_amount", "annual_interest_rate", "monthly_repayment", "extra_payment"), calculate_new_loan_term),
+}
+
+def evaluate_graph(graph, inputs, targets, cache):
+    # Record changed inputs and drop every cached node downstream of them,
+    # then lazily compute only the targets and whatever they still miss.
+    changed = {name for name, value in inputs.items() if name not in cache or cache[name] != value}
+    cache.update(inputs)
+    for name, (dependencies, _) in graph.items():
+        if changed.intersection(dependencies):
+            changed.add(name)
+            cache.pop(name, None)
+
+    def resolve(name):
+        if name not in cache:
+            dependencies, func = graph[name]
+            cache[name] = func(*(resolve(dependency) for dependency in dependencies))
+        return cache[name]
+
+    return [resolve(target) for target in targets]
+
+def mortgage_metrics(inputs, *targets):
+    cache = st.session_state.setdefault("mortgage_metrics", {})
+    return evaluate_graph(MORTGAGE_GRAPH, inputs, targets, cache)
+
+# Chart Data Functions
+# Upper bound on one chart's figure JSON, which is what st.plotly_chart sends.
+# The layout (mostly Plotly's default template) takes a roughly fixed share.
+# Each trace adds a fixed overhead plus 32/3 bytes per point, because x and y
+# are float32 arrays that Plotly encodes as base64 typed arrays.
+CHART_BYTE_BUDGET = 25_000
+CHART_LAYOUT_BYTES = 8_000
+TRACE_OVERHEAD_BYTES = 150
+POINT_BYTES = 2 * 4 * 4 / 3
+
+def aggregate_periods(values, period):
+    # Sum consecutive groups of `period` values (e.g. months into years); a
+    # trailing partial group is padded with zeros.
+    values = np.asarray(values, dtype=float)
+    values = np.pad(values, (0, -len(values) % period))
+    return values.reshape(-1, period).sum(axis=1)
+
+def downsample_minmax(x, y, max_points):
+    # Keep each bucket's minimum and maximum plus both endpoints, so peaks
+    # and troughs survive the reduction.
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    if len(y) <= max_points:
+        return x, y
+    if max_points < 4:
+        # Too few points for endpoints plus a min/max pair; space them evenly.
+        keep = np.unique(np.linspace(0, len(y) - 1, max_points).round().astype(int))
+        return x[keep], y[keep]
+    bucket_size = -(-len(y) // ((max_points - 2) // 2))
+    n_buckets = -(-len(y) // bucket_size)
+    buckets = np.full(n_buckets * bucket_size, np.nan)
+    buckets[:len(y)] = y
+    buckets = buckets.reshape(n_buckets, bucket_size)
+    offsets = np.arange(n_buckets) * bucket_size
+    # An all-NaN bucket has no min or max; keep its first point so the gap
+    # still breaks the line.
+    empty = np.isnan(buckets).all(axis=1)
+    filled = buckets[~empty]
+    keep = np.unique(np.concatenate([
+        [0, len(y) - 1],
+        offsets[empty],
+        offsets[~empty] + np.nanargmin(filled, axis=1),
+        offsets[~empty] + np.nanargmax(filled, axis=1),
+    ]))
+    return x[keep], y[keep]
+
+def aggregate_bars(x, y, max_points):
+    # Bars show totals, so merge neighbouring bars into coarser periods
+    # instead of dropping any. Each bar is labelled with its period's start.
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    if len(y) <= max_points:
+        return x, y
+    period = -(-len(y) // max_points)
+    return x[::period], aggregate_periods(y, period)
+
+def compact_traces(x, series, byte_budget=CHART_BYTE_BUDGET, bars=()):
+    # Keep as many series as fit the chart's byte budget with two points each
+    # (later series are dropped), then share the rest of the budget evenly as
+    # extra points. Series named in `bars` are re-aggregated, the rest min/max
+    # downsampled; all are cast to float32. Returns {name: (x, y)}.
+    trace_bytes = byte_budget - CHART_LAYOUT_BYTES
+    costs = np.cumsum([TRACE_OVERHEAD_BYTES + len(name) + 2 * POINT_BYTES for name in series])
+    n_traces = int(np.searchsorted(costs, trace_bytes, side="right"))
+    if n_traces == 0:
+        return {}
+    max_points = 2 + int((trace_bytes - costs[n_traces - 1]) / n_traces // POINT_BYTES)
+    traces = {}
+    for name in list(series)[:n_traces]:
+        reduce = aggregate_bars if name in bars else downsample_minmax
+        trace_x, trace_y = reduce(x, series[name], max_points)
+        traces[name] = (trace_x.astype(np.float32), trace_y.astype(np.float32))
+    return traces
+
 # Historical Treaties Data
 treaties_data = {
     "Treaty Name": [
@@ -333,6 +456,146 @@ def render_map(selected_year):
     *Note: Simplified visualization, not exact boundaries.*
     """)
 
+# Novated Lease page sections. Marginal Tax Rate only affects the lease's net
+# cost, so it lives in a fragment with the sections that use it; editing it
+# does not rebuild the Asset Value chart. Analysis sits below the chart, so the
+# fragment redraws it into a slot reserved by the full run.
+def novated_ownership_summary(current_car_value, ownership_cost, final_car_value):
+    st.subheader('Current Car Ownership')
+    st.metric('Total Cost', f'${ownership_cost:,.2f}')
+    st.metric('Final Car Value', f'${final_car_value:,.2f}')
+    st.metric('Net Cost', f'${ownership_cost - (current_car_value - final_car_value):,.2f}')
+
+@st.fragment
+def novated_lease_tax_sections(lease_args, ownership, analysis):
+    tax_rate = st.slider('Marginal Tax Rate (%)', 10, 50, 32) / 100
+    novated_cost, monthly_payment, tax_savings = calculate_novated_lease(tax_rate=tax_rate, **lease_args)
+    current_car_value, ownership_cost, final_car_value = ownership
+
+    st.header('Results')
+    col1, col2 = st.columns(2)
+    with col1:
+        novated_ownership_summary(*ownership)
+    with col2:
+        st.subheader('Novated Lease')
+        st.metric('Net Cost', f'${novated_cost:,.2f}')
+        st.metric('Monthly Payment', f'${monthly_payment:,.2f}')
+        st.metric('Tax Savings (Total over Lease Term)', f'${tax_savings:,.2f}')
+
+    st.header('Tax Savings Comparison')
+    ownership_tax_savings = 0
+    novated_lease_tax_savings = tax_savings
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric('Current Car Ownership Tax Savings', f'${ownership_tax_savings:,.2f}')
+    with col2:
+        st.metric('Novated Lease Tax Savings', f'${novated_lease_tax_savings:,.2f}')
+
+    st.write("Note: This assumes a **100% tax break** on the novated lease car expenses.")
+
+    with analysis.container():
+        novated_lease_analysis(current_car_value, ownership_cost, final_car_value, novated_cost)
+
+def novated_lease_analysis(current_car_value, ownership_cost, final_car_value, novated_cost):
+    st.header('Analysis')
+    options = {
+        'Current Car Ownership': ownership_cost - (current_car_value - final_car_value),
+        'Novated Lease': novated_cost,
+    }
+    best_option = min(options, key=options.get)
+
+    st.success(f'Based on the given parameters, the **{best_option}** appears to be the best financial option.')
+
+    for option, value in options.items():
+        st.write(f'{option}: Net Cost/Opportunity Cost = ${value:,.2f}')
+
+    st.write("Please note that this analysis is based on several assumptions and doesn't account for all factors such as:")
+    st.write("1. The utility and comfort of a new car vs. the current car")
+    st.write("2. Potential changes in tax rates over time")
+    st.write("3. The impact of inflation on purchasing power")
+    st.write("4. Unexpected repairs or other costs that may arise")
+    st.write("5. The assumption of a **100% tax break** on novated lease expenses.")
+
+def novated_lease_chart(current_car_value, new_car_value, years, ownership_cost, monthly_payment):
+    st.header('Comparison Over Time')
+    years_range = np.arange(0, years + 1)
+    ownership_values = current_car_value * (0.85 ** years_range) - (ownership_cost / years) * years_range
+    novated_values = new_car_value - np.arange(len(years_range)) * monthly_payment
+    traces = compact_traces(years_range, {
+        'Current Car Value': ownership_values,
+        'Novated Lease Car Value': novated_values,
+    })
+
+    fig = go.Figure()
+    for name, (trace_x, trace_y) in traces.items():
+        fig.add_trace(go.Scatter(x=trace_x, y=trace_y, mode='lines', name=name))
+    fig.update_layout(title='Asset Value Over Time', xaxis_title='Years', yaxis_title='Value ($)',
+                      legend=dict(x=0.01, y=0.99), height=400)
+    st.plotly_chart(fig)
+
+# Mortgage page sections that own their inputs. Each one is a fragment, so
+# editing one of its inputs reruns and re-sends only that section.
+MORTGAGE_SECTION_DEFAULTS = {
+    "selling_price": 1300000, "years_owned": 5, "capital_losses": 45000,
+    "monthly_income": 8500, "rental_income": 3000, "property_management_fee": 6.0,
+    "rent_expense": 1950, "utilities_expense": 200, "groceries_expense": 600, "other_expenses": 100,
+    "extra_payment": 1500,
+}
+
+@st.fragment
+def mortgage_sale_projection():
+    metrics = st.container()
+    with st.expander("Sale Assumptions"):
+        selling_price = st.number_input("Projected Selling Price ($)", key="selling_price", step=1000)
+        years_owned = st.number_input("Years Owned", key="years_owned", min_value=1)
+        capital_losses = st.number_input("Capital Losses/Expenditure on House ($)", key="capital_losses", step=1000)
+
+    cgt_due, net_profit_from_sale = mortgage_metrics(
+        {"selling_price": selling_price, "years_owned": years_owned, "capital_losses": capital_losses},
+        "cgt_due", "net_profit_from_sale"
+    )
+    with metrics:
+        st.metric("Capital Gains Tax", f"${cgt_due:,.2f}")
+        st.metric("Net Profit from Sale", f"${net_profit_from_sale:,.2f}")
+
+@st.fragment
+def mortgage_monthly_savings():
+    metrics = st.container()
+    with st.expander("Monthly Income and Expenses"):
+        monthly_income = st.number_input("Monthly Income ($)", key="monthly_income", step=100)
+        rental_income = st.number_input("Expected Monthly Rental Income ($)", key="rental_income", step=100)
+        property_management_fee_percentage = st.number_input("Property Management Fee (%)", key="property_management_fee", format="%.2f", step=0.1) / 100
+        rent_expense = st.number_input("Monthly Rent Expense ($)", key="rent_expense", step=50)
+        utilities_expense = st.number_input("Monthly Utilities Expense ($)", key="utilities_expense", step=50)
+        groceries_expense = st.number_input("Monthly Groceries Expense ($)", key="groceries_expense", step=50)
+        other_expenses = st.number_input("Other Monthly Expenses ($)", key="other_expenses", step=50)
+
+    net_monthly_savings, = mortgage_metrics({
+        "monthly_income": monthly_income, "rental_income": rental_income,
+        "property_management_fee_percentage": property_management_fee_percentage,
+        "rent_expense": rent_expense, "utilities_expense": utilities_expense,
+        "groceries_expense": groceries_expense, "other_expenses": other_expenses,
+    }, "net_monthly_savings")
+    with metrics:
+        st.metric("Monthly Net Savings", f"${net_monthly_savings:,.2f}")
+
+@st.fragment
+def mortgage_loan_term_reduction():
+    st.subheader("Loan Term Reduction")
+    extra_payment = st.number_input("Extra Monthly Payment ($)", key="extra_payment", step=100)
+    new_loan_months, loan_term_years = mortgage_metrics(
+        {"extra_payment": extra_payment}, "new_loan_months", "loan_term_years"
+    )
+
+    col4, col5 = st.columns(2)
+    with col4:
+        st.metric("Original Loan Term", f"{loan_term_years} years")
+    with col5:
+        new_loan_years = new_loan_months / 12
+        st.metric("New Loan Term", f"{new_loan_years:.2f} years", 
+                  delta=f"-{loan_term_years - new_loan_years:.2f} years")
+
 def personal_finance_calculator():
     st.title("Personal Finance Calculators")
     
@@ -345,7 +608,6 @@ def personal_finance_calculator():
         new_car_value = st.sidebar.number_input('New Car Value ($)', value=50000, step=1000)
         interest_rate = st.sidebar.slider('Annual Interest Rate (%)', 1.0, 10.0, 6.0) / 100
         lease_term = st.sidebar.slider('Lease Term (months)', 12, 60, 48)
-        tax_rate = st.sidebar.slider('Marginal Tax Rate (%)', 10, 50, 32) / 100
         gst_included = st.sidebar.checkbox('Is GST included in the car value?', value=False)
         st.sidebar.header('Novated Lease Costs (Annual)')
         annual_fuel = st.sidebar.number_input('Fuel/Charge Cost ($)', value=2000, step=100)
@@ -355,72 +617,25 @@ def personal_finance_calculator():
         annual_registration_insurance = st.sidebar.number_input('Registration & Insurance Cost ($)', value=1200, step=100)
 
         years = lease_term / 12
-
-        novated_cost, monthly_payment, tax_savings = calculate_novated_lease(
-            new_car_value, interest_rate, lease_term, tax_rate, gst_included,
-            annual_fuel, annual_maintenance, annual_tyres, annual_finance_costs, annual_registration_insurance
+        lease_args = dict(
+            car_value=new_car_value, interest_rate=interest_rate, lease_term=lease_term, gst_included=gst_included,
+            annual_fuel=annual_fuel, annual_maintenance=annual_maintenance, annual_tyres=annual_tyres,
+            annual_finance_costs=annual_finance_costs, annual_registration_insurance=annual_registration_insurance,
         )
+        monthly_payment = calculate_lease_payment(new_car_value, interest_rate, lease_term, gst_included)
 
         ownership_cost, final_car_value = calculate_car_ownership_costs(
             current_car_value, years, annual_maintenance, annual_registration_insurance, annual_fuel
         )
+        ownership = (current_car_value, ownership_cost, final_car_value)
 
-        st.header('Results')
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader('Current Car Ownership')
-            st.metric('Total Cost', f'${ownership_cost:,.2f}')
-            st.metric('Final Car Value', f'${final_car_value:,.2f}')
-            st.metric('Net Cost', f'${ownership_cost - (current_car_value - final_car_value):,.2f}')
-        with col2:
-            st.subheader('Novated Lease')
-            st.metric('Net Cost', f'${novated_cost:,.2f}')
-            st.metric('Monthly Payment', f'${monthly_payment:,.2f}')
-            st.metric('Tax Savings (Total over Lease Term)', f'${tax_savings:,.2f}')
-
-        st.header('Tax Savings Comparison')
-        ownership_tax_savings = 0
-        novated_lease_tax_savings = tax_savings
-        difference = novated_lease_tax_savings - ownership_tax_savings
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric('Current Car Ownership Tax Savings', f'${ownership_tax_savings:,.2f}')
-        with col2:
-            st.metric('Novated Lease Tax Savings', f'${novated_lease_tax_savings:,.2f}')
-
-        st.write("Note: This assumes a **100% tax break** on the novated lease car expenses.")
-
-        st.header('Comparison Over Time')
-        years_range = np.arange(0, years + 1)
-        ownership_values = [current_car_value * (0.85 ** year) - (ownership_cost / years) * year for year in years_range]
-        novated_values = [new_car_value - (i * monthly_payment) for i in range(len(years_range))]
-
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=years_range, y=ownership_values, mode='lines', name='Current Car Value'))
-        fig.add_trace(go.Scatter(x=years_range, y=novated_values, mode='lines', name='Novated Lease Car Value'))
-        fig.update_layout(title='Asset Value Over Time', xaxis_title='Years', yaxis_title='Value ($)',
-                          legend=dict(x=0.01, y=0.99), height=400)
-        st.plotly_chart(fig)
-
-        st.header('Analysis')
-        options = {
-            'Current Car Ownership': ownership_cost - (current_car_value - final_car_value),
-            'Novated Lease': novated_cost,
-        }
-        best_option = min(options, key=options.get)
-
-        st.success(f'Based on the given parameters, the **{best_option}** appears to be the best financial option.')
-
-        for option, value in options.items():
-            st.write(f'{option}: Net Cost/Opportunity Cost = ${value:,.2f}')
-
-        st.write("Please note that this analysis is based on several assumptions and doesn't account for all factors such as:")
-        st.write("1. The utility and comfort of a new car vs. the current car")
-        st.write("2. Potential changes in tax rates over time")
-        st.write("3. The impact of inflation on purchasing power")
-        st.write("4. Unexpected repairs or other costs that may arise")
-        st.write("5. The assumption of a **100% tax break** on novated lease expenses.")
+        tax_sections = st.container()
+        chart = st.container()
+        analysis = st.empty()
+        with tax_sections:
+            novated_lease_tax_sections(lease_args, ownership, analysis)
+        with chart:
+            novated_lease_chart(current_car_value, new_car_value, years, ownership_cost, monthly_payment)
 
     elif page == "Mortgage":
         st.title("🏡 Mortgage Repayment & Financial Projection Calculator")
@@ -432,35 +647,23 @@ def personal_finance_calculator():
         st.sidebar.subheader("Interest Rates")
         current_long_term_rate = st.sidebar.number_input("Current Long-Term Interest Rate (%)", value=6.04, step=0.01)
         current_short_term_rate = st.sidebar.number_input("Current Short-Term Interest Rate (%)", value=5.00, step=0.01)
-        st.sidebar.subheader("Financial Projections")
-        selling_price = st.sidebar.number_input("Projected Selling Price ($)", value=1300000, step=1000)
-        years_owned = st.sidebar.number_input("Years Owned", value=5, min_value=1)
-        capital_losses = st.sidebar.number_input("Capital Losses/Expenditure on House ($)", value=45000, step=1000)
-        st.sidebar.subheader("Monthly Income and Expenses")
-        monthly_income = st.sidebar.number_input("Monthly Income ($)", value=8500, step=100)
-        rental_income = st.sidebar.number_input("Expected Monthly Rental Income ($)", value=3000, step=100)
-        property_management_fee_percentage = st.sidebar.number_input("Property Management Fee (%)", value=6.0, format="%.2f", step=0.1) / 100
-        rent_expense = st.sidebar.number_input("Monthly Rent Expense ($)", value=1950, step=50)
-        utilities_expense = st.sidebar.number_input("Monthly Utilities Expense ($)", value=200, step=50)
-        groceries_expense = st.sidebar.number_input("Monthly Groceries Expense ($)", value=600, step=50)
-        other_expenses = st.sidebar.number_input("Other Monthly Expenses ($)", value=100, step=50)
-        extra_payment = st.sidebar.number_input("Extra Monthly Payment ($)", value=1500, step=100)
-
-        loan_amount = house_price - deposit
+
+        # The section inputs are not rendered while the loan amount is invalid.
+        # Re-assigning their keys every run keeps Streamlit from discarding
+        # their values in the meantime.
+        for key, default in MORTGAGE_SECTION_DEFAULTS.items():
+            st.session_state[key] = st.session_state.get(key, default)
+
+        loan_inputs = {
+            "house_price": house_price, "deposit": deposit, "loan_term_years": loan_term_years,
+            "current_long_term_rate": current_long_term_rate, "current_short_term_rate": current_short_term_rate,
+        }
+        loan_amount, = mortgage_metrics(loan_inputs, "loan_amount")
 
         if loan_amount > 0:
-            annual_interest_rate = calculate_expected_rate(current_long_term_rate / 100, current_short_term_rate / 100)
-            monthly_repayment = calculate_repayment(loan_amount, annual_interest_rate, loan_term_years)
-            principal_paid, interest_paid = breakdown_payments(loan_amount, annual_interest_rate, loan_term_years)
-            total_payment = monthly_repayment * loan_term_years * 12
-            total_interest = total_payment - loan_amount
-            cgt_due = calculate_cgt(house_price, selling_price, years_owned, capital_losses)
-            net_profit_from_sale = selling_price - house_price - cgt_due 
-            management_fee_amount = rental_income * property_management_fee_percentage
-            net_rental_income = rental_income - management_fee_amount
-            total_monthly_expenses = rent_expense + utilities_expense + groceries_expense + other_expenses + monthly_repayment - net_rental_income
-            net_monthly_savings = monthly_income - total_monthly_expenses
-            new_loan_months = calculate_new_loan_term(loan_amount, annual_interest_rate, monthly_repayment, extra_payment)
+            annual_interest_rate, monthly_repayment, (yearly_principal, yearly_interest), total_payment, total_interest = mortgage_metrics(
+                loan_inputs, "annual_interest_rate", "monthly_repayment", "yearly_payments", "total_payment", "total_interest"
+            )
 
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -475,31 +678,27 @@ def personal_finance_calculator():
                 st.metric("Interest to Principal Ratio", f"{(total_interest/loan_amount)*100:.2f}%")
             with col3:
                 st.subheader("Financial Projections")
-                st.metric("Capital Gains Tax", f"${cgt_due:,.2f}")
-                st.metric("Net Profit from Sale", f"${net_profit_from_sale:,.2f}")
-                st.metric("Monthly Net Savings", f"${net_monthly_savings:,.2f}")
-
-            st.subheader("Loan Term Reduction")
-            col4, col5 = st.columns(2)
-            with col4:
-                st.metric("Original Loan Term", f"{loan_term_years} years")
-            with col5:
-                new_loan_years = new_loan_months / 12
-                st.metric("New Loan Term", f"{new_loan_years:.2f} years", 
-                          delta=f"-{loan_term_years - new_loan_years:.2f} years")
+                mortgage_sale_projection()
+                mortgage_monthly_savings()
+
+            mortgage_loan_term_reduction()
 
             st.subheader("Payment Breakdown Over Time")
-            years = np.arange(1, loan_term_years + 1)
-            yearly_principal = [sum(principal_paid[i*12:(i+1)*12]) for i in range(loan_term_years)]
-            yearly_interest = [sum(interest_paid[i*12:(i+1)*12]) for i in range(loan_term_years)]
-            cumulative_principal = np.cumsum(yearly_principal)
-            cumulative_interest = np.cumsum(yearly_interest)
+            years = np.arange(1, len(yearly_principal) + 1)
+            traces = compact_traces(years, {
+                'Principal': yearly_principal,
+                'Interest': yearly_interest,
+                'Cumulative Principal': np.cumsum(yearly_principal),
+                'Cumulative Interest': np.cumsum(yearly_interest),
+            }, bars=('Principal', 'Interest'))
             
             fig = make_subplots(rows=1, cols=2, subplot_titles=("Yearly Breakdown", "Cumulative Payments"))
-            fig.add_trace(go.Bar(x=years, y=yearly_principal, name='Principal', marker_color='blue'), row=1, col=1)
-            fig.add_trace(go.Bar(x=years, y=yearly_interest, name='Interest', marker_color='red'), row=1, col=1)
-            fig.add_trace(go.Scatter(x=years, y=cumulative_principal, mode='lines+markers', name='Cumulative Principal', line=dict(color='blue')), row=1, col=2)
-            fig.add_trace(go.Scatter(x=years, y=cumulative_interest, mode='lines+markers', name='Cumulative Interest', line=dict(color='red')), row=1, col=2)
+            for name, color in [('Principal', 'blue'), ('Interest', 'red')]:
+                trace_x, trace_y = traces[name]
+                fig.add_trace(go.Bar(x=trace_x, y=trace_y, name=name, marker_color=color), row=1, col=1)
+            for name, color in [('Cumulative Principal', 'blue'), ('Cumulative Interest', 'red')]:
+                trace_x, trace_y = traces[name]
+                fig.add_trace(go.Scatter(x=trace_x, y=trace_y, mode='lines+markers', name=name, line=dict(color=color)), row=1, col=2)
             fig.update_layout(height=400, showlegend=True, legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
             fig.update_xaxes(title_text="Year", row=1, col=1)
             fig.update_xaxes(title_text="Year", row=1, col=2)
@@ -682,6 +881,41 @@ def hobby_page():
         st.markdown("Created for educational purposes, updated March 01, 2025.")
 
 
+# AI/ML page figures are static, so build them once per process and share the
+# Figure objects. The fixed seed keeps every rerun's payload byte-identical.
+@st.cache_resource(show_spinner=False)
+def ai_ml_figures():
+    rng = np.random.default_rng(42)
+    figures = {}
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=[1, 2, 3, 2], y=[2, 2, 2, 1], mode='text', text=['AI/ML', 'Stats/Math', 'EE/IT', 'Overlap'], textposition='middle center', showlegend=False))
+    fig.add_shape(type="circle", xref="x", yref="y", x0=0.5, y0=1.5, x1=1.5, y1=2.5, line_color="blue", fillcolor="rgba(0, 0, 255, 0.2)", label=dict(text="AI/ML"))
+    fig.add_shape(type="circle", xref="x", yref="y", x0=1.5, y0=1.5, x1=2.5, y1=2.5, line_color="green", fillcolor="rgba(0, 255, 0, 0.2)", label=dict(text="Stats/Math"))
+    fig.add_shape(type="circle", xref="x", yref="y", x0=2.5, y0=1.5, x1=3.5, y1=2.5, line_color="red", fillcolor="rgba(255, 0, 0, 0.2)", label=dict(text="EE/IT"))
+    fig.update_layout(title="Overlap of Disciplines", height=400, width=600, showlegend=False)
+    figures["ai_ml_overlap"] = fig
+
+    figures["supervised_fig"] = px.scatter(x=[1, 2, 3], y=[1, 2, 1], color=['Label A', 'Label B', 'Label A'], title="Supervised Learning")
+    figures["unsupervised_fig"] = px.scatter(x=rng.random(50), y=rng.random(50), title="Unsupervised Clustering")
+    figures["reinforcement_fig"] = go.Figure(go.Scatter(x=[1, 2, 3], y=[0, 1, 2], mode='lines+markers', name="Reward Path"))
+    figures["self_supervised_fig"] = px.line(x=[1, 2, 3], y=[1, 0, 1], title="Self-Supervised Curve")
+    figures["model_based_fig"] = go.Figure(go.Scatter(x=[1, 2, 3], y=[1, 2, 3], mode='lines', name="Predicted Path"))
+    figures["model_free_fig"] = go.Figure(go.Scatter(x=[1, 2, 3], y=[1, 1.5, 1], mode='lines', name="Learned Path"))
+    return figures
+
+def render_cached_figure(name, **kwargs):
+    st.plotly_chart(ai_ml_figures()[name], key=name, **kwargs)
+
+# Each method expander is its own fragment, so opening or closing it reruns
+# only that section, and its chart is drawn only while it is open.
+@st.fragment
+def ai_ml_method(title, key, figure_name, description):
+    with st.expander(title, key=key, on_change="rerun") as expander:
+        st.markdown(description)
+        if expander.open:
+            render_cached_figure(figure_name)
+
 # New AI/ML Page
 def ai_ml_page():
     st.title("AI & ML: A Cosmic Journey Through Learning Paradigms")
@@ -691,13 +925,7 @@ def ai_ml_page():
 
     # Venn Diagram-like Visualization
     st.subheader("The Cosmic Overlap")
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=[1, 2, 3, 2], y=[2, 2, 2, 1], mode='text', text=['AI/ML', 'Stats/Math', 'EE/IT', 'Overlap'], textposition='middle center', showlegend=False))
-    fig.add_shape(type="circle", xref="x", yref="y", x0=0.5, y0=1.5, x1=1.5, y1=2.5, line_color="blue", fillcolor="rgba(0, 0, 255, 0.2)", label=dict(text="AI/ML"))
-    fig.add_shape(type="circle", xref="x", yref="y", x0=1.5, y0=1.5, x1=2.5, y1=2.5, line_color="green", fillcolor="rgba(0, 255, 0, 0.2)", label=dict(text="Stats/Math"))
-    fig.add_shape(type="circle", xref="x", yref="y", x0=2.5, y0=1.5, x1=3.5, y1=2.5, line_color="red", fillcolor="rgba(255, 0, 0, 0.2)", label=dict(text="EE/IT"))
-    fig.update_layout(title="Overlap of Disciplines", height=400, width=600, showlegend=False)
-    st.plotly_chart(fig, use_container_width=True, key="ai_ml_overlap")
+    render_cached_figure("ai_ml_overlap", use_container_width=True)
     st.markdown("*AI/ML is a spaceship fueled by Stats/Math engines and guided by EE/IT navigation systems!*")
 
     # Main AI/ML Methods
@@ -705,76 +933,58 @@ def ai_ml_page():
     col1, col2 = st.columns(2)
     
     with col1:
-        with st.expander("Supervised Learning: The Guided Navigator"):
-            st.markdown("""
+        ai_ml_method("Supervised Learning: The Guided Navigator", "supervised_expander", "supervised_fig", """
             Like a captain with a map, supervised learning uses labeled data (stars with names) to chart a course. 
             - **Math/Stats**: Regression (y = mx + b) and classification (decision boundaries) steer the ship.
             - **Examples**: Predicting house prices, spam detection.
             - **Overlap**: EE uses signal processing to preprocess data; IT optimizes data encoding.
             """)
-            fig = px.scatter(x=[1, 2, 3], y=[1, 2, 1], color=['Label A', 'Label B', 'Label A'], title="Supervised Learning")
-            st.plotly_chart(fig, key="supervised_fig")
     
     with col2:
-        with st.expander("Unsupervised Learning: The Cosmic Explorer"):
-            st.markdown("""
+        ai_ml_method("Unsupervised Learning: The Cosmic Explorer", "unsupervised_expander", "unsupervised_fig", """
             An astronaut without a map, unsupervised learning finds patterns in unlabeled data (uncharted stars).
             - **Math/Stats**: Clustering (k-means) and dimensionality reduction (PCA) reveal hidden constellations.
             - **Examples**: Customer segmentation, anomaly detection.
             - **Overlap**: EE’s circuit analysis inspires feature extraction; IT’s compression aligns with data reduction.
             """)
-            fig = px.scatter(x=np.random.rand(50), y=np.random.rand(50), title="Unsupervised Clustering")
-            st.plotly_chart(fig, key="unsupervised_fig")
 
     col3, col4 = st.columns(2)
     
     with col3:
-        with st.expander("Reinforcement Learning: The Galactic Adventurer"):
-            st.markdown("""
+        ai_ml_method("Reinforcement Learning: The Galactic Adventurer", "reinforcement_expander", "reinforcement_fig", """
             A spacefarer learning by trial and error, reinforcement learning optimizes actions via rewards.
             - **Math/Stats**: Markov processes and dynamic programming calculate the best path.
             - **Examples**: Game playing (AlphaGo), robotics.
             - **Overlap**: EE’s control theory designs reward systems; IT’s decision theory shapes policies.
             """)
-            fig = go.Figure(go.Scatter(x=[1, 2, 3], y=[0, 1, 2], mode='lines+markers', name="Reward Path"))
-            st.plotly_chart(fig, key="reinforcement_fig")
     
     with col4:
-        with st.expander("Self-Supervised Learning: The Reflective Stargazer"):
-            st.markdown("""
+        ai_ml_method("Self-Supervised Learning: The Reflective Stargazer", "self_supervised_expander", "self_supervised_fig", """
             A telescope that learns from its own reflections, self-supervised learning generates labels from data itself.
             - **Math/Stats**: Autoencoders and contrastive loss map the cosmos.
             - **Examples**: Language models (BERT), image pretraining.
             - **Overlap**: EE’s signal reconstruction mirrors data generation; IT’s entropy guides self-labeling.
             """)
-            fig = px.line(x=[1, 2, 3], y=[1, 0, 1], title="Self-Supervised Curve")
-            st.plotly_chart(fig, key="self_supervised_fig")
 
     # Model-Based vs Model-Free
     st.subheader("The Galactic Philosophies")
     col5, col6 = st.columns(2)
     
     with col5:
-        with st.expander("Model-Based: The Cosmic Architect"):
-            st.markdown("""
+        ai_ml_method("Model-Based: The Cosmic Architect", "model_based_expander", "model_based_fig", """
             Building a blueprint of the universe, model-based methods predict outcomes using an internal model.
             - **Math/Stats**: Differential equations and Bayesian inference construct the model.
             - **Examples**: Robotics planning, economic forecasting.
             - **Overlap**: EE’s system modeling aligns here; IT’s simulation theory supports predictions.
             """)
-            fig = go.Figure(go.Scatter(x=[1, 2, 3], y=[1, 2, 3], mode='lines', name="Predicted Path"))
-            st.plotly_chart(fig, key="model_based_fig")
     
     with col6:
-        with st.expander("Model-Free: The Instinctive Voyager"):
-            st.markdown("""
+        ai_ml_method("Model-Free: The Instinctive Voyager", "model_free_expander", "model_free_fig", """
             Navigating without a map, model-free methods learn directly from experience.
             - **Math/Stats**: Q-learning and policy gradients drive decisions.
             - **Examples**: Game AI, autonomous driving.
             - **Overlap**: EE’s adaptive filters inspire learning; IT’s real-time systems optimize speed.
             """)
-            fig = go.Figure(go.Scatter(x=[1, 2, 3], y=[1, 1.5, 1], mode='lines', name="Learned Path"))
-            st.plotly_chart(fig, key="model_free_fig")
 
     # Closing Note
     st.markdown("""
@@ -0,0 +1,330 @@
+"""Multi-session load test for app.py against one Streamlit server.
+
+Starts ``streamlit run app.py`` and drives N concurrent sessions over the same
+websocket protocol the browser uses. Every action sets one widget and sends a
+rerun request, scoped to the widget's fragment when it has one; its latency
+runs until the server reports that run finished. All sessions share the one
+server process, its script threads, the GIL and ``st.cache_resource``, as in
+one container, so the throughput and memory figures can be used for sizing.
+
+Sessions do not keep the browser's message cache, so every rerun re-sends all
+elements and latencies are slightly pessimistic.
+
+Usage:
+    python load_test.py --sessions 8 --iterations 3
+    python load_test.py --sessions 32 --iterations 1 --no-play
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def start_server(port, start_timeout):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + start_timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"streamlit exited with code {server.returncode} on startup")
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f"streamlit did not become healthy within {start_timeout:.0f} s")
+
+
+def rss_bytes(pid, field="VmRSS"):
+    # Linux only; VmHWM is the peak resident set size.
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class Session:
+    """One simulated browser tab: a websocket plus the widgets it last saw."""
+
+    def __init__(self, websocket, timeout):
+        self.websocket = websocket
+        self.timeout = timeout
+        self.page_script_hash = ""
+        self.widgets = {}  # label -> (kind, widget id, fragment id)
+        self.states = {}  # widget id -> WidgetState the user has set
+        self.exceptions = []
+
+    async def rerun(self, fragment_id="", trigger=None):
+        msg = BackMsg()
+        client_state = msg.rerun_script
+        client_state.page_script_hash = self.page_script_hash
+        client_state.fragment_id = fragment_id
+        live_ids = {widget_id for _, widget_id, _ in self.widgets.values()}
+        for widget_id, state in self.states.items():
+            if widget_id in live_ids:
+                client_state.widget_states.widgets.append(state)
+        if trigger is not None:
+            client_state.widget_states.widgets.append(trigger)
+        if not fragment_id:
+            # A full run redraws the page, so widgets not drawn again are gone.
+            self.widgets = {}
+        await self.websocket.send(msg.SerializeToString())
+        await asyncio.wait_for(self._receive_until_finished(), self.timeout)
+
+    async def _receive_until_finished(self):
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await self.websocket.recv())
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                self.page_script_hash = fwd.new_session.page_script_hash
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._record_element(fwd.delta)
+            elif kind == "script_finished":
+                if fwd.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    self.exceptions.append("script failed to compile")
+                return
+
+    def _record_element(self, delta):
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        proto = getattr(element, kind)
+        if kind == "exception":
+            self.exceptions.append(f"{proto.type}: {proto.message}")
+        elif hasattr(proto, "id") and hasattr(proto, "label"):
+            self.widgets[proto.label] = (kind, proto.id, delta.fragment_id)
+
+    def _widget(self, label):
+        if label not in self.widgets:
+            raise LookupError(f"No widget labelled {label!r} on the current page")
+        return self.widgets[label]
+
+    async def set_value(self, label, value):
+        kind, widget_id, fragment_id = self._widget(label)
+        state = WidgetState(id=widget_id)
+        if kind == "slider":
+            state.double_array_value.data.append(value)
+        elif kind == "number_input":
+            state.double_value = value
+        else:  # radio, text_input
+            state.string_value = value
+        self.states[widget_id] = state
+        await self.rerun(fragment_id)
+
+    async def click(self, label):
+        _, widget_id, fragment_id = self._widget(label)
+        await self.rerun(fragment_id, trigger=WidgetState(id=widget_id, trigger_value=True))
+
+
+# Session actions. Each one changes a single input and triggers one rerun.
+async def switch_page(session, rng, page):
+    await session.set_value("Select Page", page)
+
+
+async def search_treaties(session, rng):
+    term = rng.choice(["START", "Minsk", "Crimea", "Russia", "Treaty", ""])
+    await session.set_value("Search Treaties:", term)
+
+
+async def move_year_slider(session, rng):
+    await session.set_value("Select Year", rng.randint(1920, 2024))
+
+
+async def play_evolution(session, rng):
+    await session.click("Play Evolution")
+
+
+async def switch_calculator(session, rng, calculator):
+    await session.set_value("Select Calculator", calculator)
+
+
+async def move_lease_rate(session, rng):
+    await session.set_value("Annual Interest Rate (%)", round(rng.uniform(1.0, 10.0), 1))
+
+
+async def move_lease_term(session, rng):
+    await session.set_value("Lease Term (months)", rng.randint(12, 60))
+
+
+async def move_tax_rate(session, rng):
+    await session.set_value("Marginal Tax Rate (%)", rng.randint(10, 50))
+
+
+async def edit_extra_payment(session, rng):
+    await session.set_value("Extra Monthly Payment ($)", rng.randrange(0, 5000, 100))
+
+
+async def edit_groceries(session, rng):
+    await session.set_value("Monthly Groceries Expense ($)", rng.randrange(300, 1500, 50))
+
+
+def scenario(play):
+    steps = [
+        ("search_treaties", search_treaties),
+        ("year_slider", move_year_slider),
+    ]
+    if play:
+        steps.append(("play_evolution", play_evolution))
+    steps += [
+        ("page_ai_ml", lambda session, rng: switch_page(session, rng, "AI/ML")),
+        ("page_finance", lambda session, rng: switch_page(session, rng, "Personal Finance Cal")),
+        ("calc_novated_lease", lambda session, rng: switch_calculator(session, rng, "Novated Lease")),
+        ("lease_rate", move_lease_rate),
+        ("lease_term", move_lease_term),
+        ("lease_tax_rate", move_tax_rate),
+        ("calc_mortgage", lambda session, rng: switch_calculator(session, rng, "Mortgage")),
+        ("mortgage_extra", edit_extra_payment),
+        ("mortgage_groceries", edit_groceries),
+        ("page_hobby", lambda session, rng: switch_page(session, rng, "Hobby")),
+    ]
+    return steps
+
+
+async def run_session(session, session_id, iterations, play, start=None):
+    rng = random.Random(session_id)
+    latencies = defaultdict(list)
+    errors = []
+
+    async def timed(name, action):
+        seen = len(session.exceptions)
+        started = time.perf_counter()
+        try:
+            await action(session, rng)
+        except Exception as exc:
+            errors.append(f"session {session_id} {name}: {exc!r}")
+            return False
+        latencies[name].append(time.perf_counter() - started)
+        errors.extend(f"session {session_id} {name}: {message}" for message in session.exceptions[seen:])
+        return True
+
+    if start is not None:
+        await start.wait()
+    if await timed("initial_load", lambda session, rng: session.rerun()):
+        for _ in range(iterations):
+            for name, action in scenario(play):
+                await timed(name, action)
+    return {"latencies": dict(latencies), "errors": errors}
+
+
+async def drive(url, n_sessions, iterations, play, timeout, server_pid):
+    connect = lambda: websockets.connect(url, subprotocols=["streamlit"], max_size=None)
+
+    # One warm-up session pays for imports, module-level state and
+    # st.cache_resource, so they are not billed to the measured sessions.
+    async with connect() as websocket:
+        await run_session(Session(websocket, timeout), -1, 1, False)
+    baseline_rss = rss_bytes(server_pid)
+
+    websockets_open = [await connect() for _ in range(n_sessions)]
+    try:
+        start = asyncio.Event()
+        tasks = [
+            asyncio.create_task(run_session(Session(websocket, timeout), i, iterations, play, start))
+            for i, websocket in enumerate(websockets_open)
+        ]
+        started = time.perf_counter()
+        start.set()
+        results = await asyncio.gather(*tasks)
+        wall_time = time.perf_counter() - started
+        # Measure while every session is still connected and holds its state.
+        final_rss = rss_bytes(server_pid)
+    finally:
+        for websocket in websockets_open:
+            await websocket.close()
+
+    memory = None
+    if baseline_rss is not None and final_rss is not None:
+        memory = {
+            "baseline": baseline_rss,
+            "per_session": (final_rss - baseline_rss) / n_sessions,
+            "peak": rss_bytes(server_pid, "VmHWM"),
+        }
+    return results, wall_time, memory
+
+
+def format_row(name, samples):
+    values = np.array(samples) * 1000
+    pct = np.percentile(values, PERCENTILES)
+    cells = "".join(f"{p:>10.1f}" for p in pct)
+    return f"{name:<20}{len(values):>7}{values.mean():>10.1f}{cells}{values.max():>10.1f}"
+
+
+def report(results, wall_time, memory, n_sessions):
+    latencies = defaultdict(list)
+    errors = []
+    for result in results:
+        for name, samples in result["latencies"].items():
+            latencies[name].extend(samples)
+        errors.extend(result["errors"])
+    all_samples = [s for samples in latencies.values() for s in samples]
+
+    header = "".join(f"{f'p{p}':>10}" for p in PERCENTILES)
+    print(f"\nRerun latency (ms) across {n_sessions} concurrent sessions on one server")
+    print(f"{'action':<20}{'count':>7}{'mean':>10}{header}{'max':>10}")
+    for name, samples in latencies.items():
+        print(format_row(name, samples))
+    if all_samples:
+        print(format_row("ALL", all_samples))
+
+    print(f"\nWall time:             {wall_time:.2f} s")
+    print(f"Throughput:            {len(all_samples) / wall_time:.2f} reruns/s")
+    if memory is not None:
+        print(f"Server RSS (warm):     {memory['baseline'] / 2**20:.1f} MiB")
+        print(f"Memory per session:    {memory['per_session'] / 2**20:.2f} MiB")
+        if memory["peak"] is not None:
+            print(f"Server peak RSS:       {memory['peak'] / 2**20:.1f} MiB")
+
+    if errors:
+        print(f"\n{len(errors)} error(s):")
+        for error in errors[:20]:
+            print(f"  {error}")
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent session load test for the Streamlit app.")
+    parser.add_argument("--sessions", type=int, default=4, help="number of concurrent simulated sessions")
+    parser.add_argument("--iterations", type=int, default=2, help="scenario repetitions per session")
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout in seconds")
+    parser.add_argument("--start-timeout", type=float, default=60,
+                        help="seconds to wait for the server to start")
+    parser.add_argument("--port", type=int, default=8599, help="port for the server under test")
+    parser.add_argument("--no-play", action="store_true", help="skip the ~10 s 'Play Evolution' animation")
+    args = parser.parse_args(argv)
+
+    server = start_server(args.port, args.start_timeout)
+    try:
+        results, wall_time, memory = asyncio.run(drive(
+            f"ws://localhost:{args.port}/_stcore/stream", args.sessions, args.iterations,
+            not args.no_play, args.timeout, server.pid,
+        ))
+    finally:
+        server.terminate()
+        server.wait()
+    return report(results, wall_time, memory, args.sessions)
+
+
+if __name__ == "__main__":
+    sys.exit(main())